@@ -18,196 +18,456 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
-from datetime import timedelta
+import struct
+from collections import namedtuple
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN, CONF_SHARED_KEY
-from .client import UniiClient
+from .const import (
+    DOMAIN,
+    CONF_SHARED_KEY,
+    CONF_USER_CODE,
+    SECTION_SCAN_INTERVAL,
+    SECTION_SCAN_INTERVAL_MAX,
+    SECTION_SCAN_INTERVAL_FAST,
+    INPUT_SCAN_INTERVAL,
+    REQUEST_REFRESH_COOLDOWN,
+    RECONNECT_DELAY_MIN,
+    RECONNECT_DELAY_MAX,
+)
+from .client import UniiClient, _LazyHex
 
 _LOGGER = logging.getLogger(__name__)
 
 VERSION = "1.6.4"
 PLATFORMS: list[Platform] = [Platform.ALARM_CONTROL_PANEL, Platform.BINARY_SENSOR, Platform.SWITCH]
+ARRANGEMENT_STORAGE_VERSION = 1
+
+# 0x0117 section status pair: (section_number, armed_state)
+_SECTION_PAIR = struct.Struct("BB")
+
+# Per-poll input record; one small tuple per input instead of a 5-key dict
+InputState = namedtuple("InputState", "status bypassed low_battery name sensor_type")
+
+# Status byte -> (status, bypassed, low_battery); None for disabled/unused inputs
+# (lower nibble 0x0F). Lower nibble is the state, bit 4 bypassed, bit 6 low
+# battery (Guess).
+_STATUS_DECODE = tuple(
+    None if (b & 0x0F) == 0x0F else (b & 0x0F, bool(b & 0x10), bool(b & 0x40))
+    for b in range(256)
+)
+
+# Stored on entry.runtime_data for the platforms
+UniiRuntimeData = namedtuple("UniiRuntimeData", "client sections inputs user_code keepalive")
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Unii from a config entry."""
-    _LOGGER.info(f"=== UNii Integration v{VERSION} starting ===")
-    hass.data.setdefault(DOMAIN, {})
+    _LOGGER.info("=== UNii Integration v%s starting ===", VERSION)
 
     host = entry.data[CONF_HOST]
     port = entry.data[CONF_PORT]
-    # Check Shared Key Override in Options
-    shared_key = entry.options.get(CONF_SHARED_KEY, entry.data.get(CONF_SHARED_KEY))
+    client = UniiClient(host, port, _get_shared_key(entry))
+    poll_counter = itertools.count(1)  # Shared by both polls, for log correlation
+    last_frames = {"sections": None, "inputs": None}  # Raw payload of last parsed poll
+
+    # Zone names never change at runtime: use the copy saved by the previous
+    # start and only download them (once, outside the polls) when there is none
+    store = _arrangement_store(hass, entry)
+    input_arrangement = _arrangement_from_records(await store.async_load())
+    arrangement_cached = bool(input_arrangement)
+    if arrangement_cached:
+        _LOGGER.info("Input arrangement: %d zones loaded from cache", len(input_arrangement))
+    input_plan = _build_input_plan(input_arrangement)
+
+    def _check_connected(poll_num: int):
+        """Fail the poll while the keepalive task is re-establishing the connection."""
+        if not client.is_connected:
+            _LOGGER.debug("Poll #%d: Not connected, waiting for reconnect", poll_num)
+            raise UpdateFailed("Not connected to Unii panel")
+
+    async def async_update_sections():
+        """Fetch section (arm) status from Unii."""
+        poll_num = next(poll_counter)
+        
+        try:
+            # 1. Connection is owned by the keepalive task
+            _check_connected(poll_num)
+
+            # 2. Poll Sections
+            section_resp = await client.get_status()
+            if not section_resp:
+                # A failed request has already torn the socket down; the
+                # keepalive task reconnects and the next poll picks it up
+                _LOGGER.warning("Poll #%d: Section poll failed.", poll_num)
+                raise UpdateFailed("No section response")
+
+            # 3. Parse Sections (the client only hands over 0x0117 responses)
+            raw_data = section_resp["data"]
+            # Unchanged frame: keep the current data so no entity is rewritten
+            if (
+                raw_data == last_frames["sections"]
+                and section_coordinator.data
+                and not client.section_state_events
+            ):
+                # Nothing happening: poll less often, up to the maximum
+                if not _sections_in_transition(section_coordinator.data["sections"]):
+                    section_coordinator.update_interval = min(
+                        section_coordinator.update_interval * 1.5, SECTION_SCAN_INTERVAL_MAX
+                    )
+                return section_coordinator.data
+            last_frames["sections"] = raw_data
+            _LOGGER.debug("Poll #%d RAW section data: %s (%d bytes)", poll_num, _LazyHex(raw_data), len(raw_data))
+            data = {"sections": _parse_sections(raw_data)}
+
+            _LOGGER.debug("Poll #%d SECTIONS from poll: %s", poll_num, data["sections"])
+            
+            # 3b. Merge section state change events (physical keypad arm/disarm)
+            _apply_section_events(client, data["sections"], section_coordinator)
+
+            section_coordinator.update_interval = _section_scan_interval(data["sections"])
+            return data
+
+        except UpdateFailed:
+            raise
+        except Exception as err:
+            _LOGGER.error("Poll #%d error: %s", poll_num, err)
+            await client.disconnect()
+            raise UpdateFailed(f"Poll error: {err}")
+
+    async def async_update_inputs():
+        """Fetch input (zone) status from Unii."""
+        poll_num = next(poll_counter)
+
+        try:
+            # 1. Connection is owned by the keepalive task
+            _check_connected(poll_num)
+
+            # 2. Poll Inputs
+            input_resp = await client.get_input_status()
+            if not input_resp:
+                 _LOGGER.warning("Poll #%d: Input poll failed.", poll_num)
+                 raise UpdateFailed("No input response")
+            input_coordinator.answered_polls += 1
+
+            # 3. Parse Inputs (the client only hands over 0x0105 responses)
+            raw_data = input_resp["data"]
+            # Unchanged frame: keep the current data so no entity is rewritten
+            if raw_data == last_frames["inputs"] and input_coordinator.data:
+                return input_coordinator.data
+            last_frames["inputs"] = raw_data
+            data = {"inputs": _parse_inputs(raw_data, input_plan)}
+
+            return data
+
+        except UpdateFailed:
+            raise
+        except Exception as err:
+            _LOGGER.error("Poll #%d error: %s", poll_num, err)
+            await client.disconnect()
+            raise UpdateFailed(f"Poll error: {err}")
+
+    # Sections and inputs are polled by separate coordinators, so a failing
+    # input poll no longer marks the alarm panels unavailable (and vice versa).
+    # No lock is shared with the entities: the client matches responses to
+    # requests, so arm/disarm frames interleave with the polls.
+    # always_update=False: listeners are only notified when the data changed.
+    # Refresh requests run at once, and any made during the short cooldown
+    # after that (e.g. several panels commanded back-to-back) share one poll.
+    section_coordinator = DataUpdateCoordinator(
+        hass,
+        _LOGGER,
+        name="unii_sections",
+        update_method=async_update_sections,
+        update_interval=SECTION_SCAN_INTERVAL,
+        request_refresh_debouncer=Debouncer(
+            hass, _LOGGER, cooldown=REQUEST_REFRESH_COOLDOWN, immediate=True
+        ),
+        always_update=False,
+    )
+    input_coordinator = DataUpdateCoordinator(
+        hass,
+        _LOGGER,
+        name="unii_inputs",
+        update_method=async_update_inputs,
+        update_interval=INPUT_SCAN_INTERVAL,
+        request_refresh_debouncer=Debouncer(
+            hass, _LOGGER, cooldown=REQUEST_REFRESH_COOLDOWN, immediate=True
+        ),
+        always_update=False,
+    )
+    for coordinator in (section_coordinator, input_coordinator):
+        coordinator.client = client
+    section_coordinator.state_overrides = {}  # {section_id: state}, see alarm_control_panel
+    input_coordinator.answered_polls = 0  # Lets commands tell a poll ran, see switch
+
+    @callback
+    def _async_handle_section_event():
+        """Push section events captured by the client reader straight to the entities."""
+        if not section_coordinator.data:
+            return
+        data = {**section_coordinator.data, "sections": dict(section_coordinator.data["sections"])}
+        # The pushed data no longer matches the last frame: parse the next one
+        last_frames["sections"] = None
+        _apply_section_events(client, data["sections"], section_coordinator)
+        section_coordinator.update_interval = _section_scan_interval(data["sections"])
+        section_coordinator.async_set_updated_data(data)
+
+    client.on_section_event = _async_handle_section_event
+
+    @callback
+    def _async_push_sections(states: dict) -> None:
+        """Fold acknowledged arm/disarm results into the data and push them to the entities."""
+        if not section_coordinator.data:
+            return
+        # The pushed data no longer matches the last frame: parse the next one
+        last_frames["sections"] = None
+        sections = {**section_coordinator.data["sections"], **states}
+        section_coordinator.async_set_updated_data({**section_coordinator.data, "sections": sections})
+
+    section_coordinator.async_push_sections = _async_push_sections
+
+    # Open the session the polls share; from here on the keepalive task owns it
+    if not await client.connect():
+        raise ConfigEntryNotReady(f"Could not connect to Unii panel at {host}:{port}")
+
+    # Until setup completes, any failure must release the panel's session slot:
+    # the reader task would otherwise keep the socket open, and the retry
+    # after ConfigEntryNotReady would have to contend with it
+    download = keepalive = None
+    try:
+        if arrangement_cached:
+            # Refresh both together: the client matches responses by command, so the
+            # section and input requests go out back-to-back on the one connection
+            await asyncio.gather(
+                section_coordinator.async_config_entry_first_refresh(),
+                input_coordinator.async_config_entry_first_refresh(),
+            )
+        else:
+            # The section poll needs no zone names, so it runs while the arrangement
+            # downloads; both share the connection, which then stays open for the polls
+            download = asyncio.create_task(_async_download_arrangement(client))
+            await section_coordinator.async_config_entry_first_refresh()
+            input_arrangement = await download
+            if input_arrangement:
+                await store.async_save(_arrangement_to_records(input_arrangement))
+            input_plan = _build_input_plan(input_arrangement)
+            await input_coordinator.async_config_entry_first_refresh()
+
+        keepalive = entry.async_create_background_task(
+            hass, _async_keepalive(client), "unii_keepalive"
+        )
+        entry.runtime_data = UniiRuntimeData(
+            client, section_coordinator, input_coordinator, entry.data.get(CONF_USER_CODE), keepalive
+        )
 
-    client = UniiClient(host, port, shared_key)
-    poll_count = [0]  # Mutable counter for closure
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except Exception:
+        if download is not None:
+            download.cancel()
+        if keepalive is not None:
+            # Would otherwise reconnect the session that is closed below
+            keepalive.cancel()
+        await client.disconnect()
+        raise
+
+    if arrangement_cached:
+        # Pick up zones renamed on the panel since the cache was written
+        entry.async_create_background_task(
+            hass,
+            _async_refresh_arrangement_cache(client, store, input_arrangement),
+            "unii_arrangement_refresh",
+        )
     
-    # Shared lock: prevents poll from disconnecting during arm/disarm
-    operation_lock = asyncio.Lock()
+    entry.async_on_unload(entry.add_update_listener(update_listener))
+    
+    _LOGGER.info("=== UNii Integration v%s loaded successfully ===", VERSION)
+
+    return True
+
+async def _async_download_arrangement(client: UniiClient) -> dict:
+    """Download the input arrangement (zone names).
 
-    # Download input arrangement (zone names) once at startup
-    # Uses a separate connection that is cleanly closed after download
+    The connection is left open afterwards so the polls can reuse it.
+    """
     input_arrangement = {}
     try:
-        _LOGGER.warning("Downloading input arrangement (zone names)...")
+        _LOGGER.info("Downloading input arrangement (zone names)...")
         if await client.connect():
             arr_data = await client.get_input_arrangement()
             if arr_data and "inputs" in arr_data:
                 input_arrangement = arr_data["inputs"]
-                _LOGGER.warning(f"Input arrangement: {len(input_arrangement)} zones loaded")
-                for inp_id, inp_data in input_arrangement.items():
-                    _LOGGER.info(f"  Zone {inp_id}: {inp_data.get('name', '?')}")
+                _LOGGER.info("Input arrangement: %d zones loaded", len(input_arrangement))
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    for inp_id, inp_data in input_arrangement.items():
+                        _LOGGER.debug("  Zone %s: %s", inp_id, inp_data.get("name", "?"))
             else:
                 _LOGGER.debug("No input arrangement data received")
-            await client.disconnect()
         else:
             _LOGGER.warning("Could not connect for arrangement download")
     except Exception as e:
-        _LOGGER.warning(f"Arrangement download failed (non-fatal): {e}")
-        await client.disconnect()
+        _LOGGER.warning("Arrangement download failed (non-fatal): %s", e)
+    return input_arrangement
 
-    async def async_update_data():
-        """Fetch data from Unii."""
-        poll_count[0] += 1
-        poll_num = poll_count[0]
-        
-        async with operation_lock:
-            try:
-                # 1. Maintain Connection
-                if not client._connected or not client.writer:
-                    _LOGGER.debug(f"Poll #{poll_num}: Connecting...")
-                    if not await client.connect():
-                        raise UpdateFailed("Failed to connect to Unii panel")
-
-                # 1b. Drain any buffered events (e.g. keypad arm/disarm between polls)
-                drained = await client.drain_events()
-                if drained > 0:
-                    _LOGGER.warning(f"Poll #{poll_num}: Drained {drained} events from buffer")
-
-                # 2. Poll Sections
-                section_resp = await client.get_status()
-                if not section_resp:
-                    _LOGGER.warning(f"Poll #{poll_num}: Section poll failed. Reconnecting...")
-                    await client.disconnect()
-                    # Retry once immediately
-                    if await client.connect():
-                        section_resp = await client.get_status()
-                    if not section_resp:
-                        raise UpdateFailed("No section response after retry")
-
-                # 3. Poll Inputs
-                input_resp = await client.get_input_status()
-                if not input_resp:
-                     _LOGGER.warning(f"Poll #{poll_num}: Input poll failed.")
-                     raise UpdateFailed("No input response")
-
-                data = {"sections": {}, "inputs": {}}
-
-                # 4. Parse Sections (pairs of section_number, armed_state)
-                if section_resp.get("command") == 0x0117:
-                    raw_data = section_resp["data"]
-                    _LOGGER.warning(f"Poll #{poll_num} RAW section data: {raw_data.hex()} ({len(raw_data)} bytes)")
-                    for i in range(0, len(raw_data), 2):
-                        if i + 1 < len(raw_data):
-                            section_num = raw_data[i]
-                            section_state = raw_data[i + 1]
-                            if section_num != 0xFF:  # Skip filler/not-programmed
-                                data["sections"][section_num] = section_state
-                                _LOGGER.warning(f"  Parsed: section {section_num} = state {section_state}")
-                            else:
-                                _LOGGER.debug(f"  Skipped filler at offset {i}")
-                
-                _LOGGER.warning(f"Poll #{poll_num} SECTIONS from poll: {data['sections']}")
-                
-                # 4b. Merge section state change events (physical keypad arm/disarm)
-                if client.section_state_events:
-                    from .alarm_control_panel import _set_override
-                    for sec_num, sec_state in client.section_state_events.items():
-                        data["sections"][sec_num] = sec_state
-                        _set_override(sec_num, sec_state)
-                        _LOGGER.warning(f"Applied section event: section={sec_num} state={sec_state}")
-                    client.section_state_events.clear()
-
-                # 5. Parse Inputs
-                # Command 0x0105: Version(1)|Reserved(1)|[Byte1(Stat)][Byte2(Reserved?)]...
-                if input_resp.get("command") == 0x0105:
-                    raw_data = input_resp["data"]
-                    offset = 2
-                    
-                    # Iterate over known inputs from arrangement
-                    # This is O(N) where N is number of inputs.
-                    # Flattened arrangement loop is safer than while loop on raw_data 
-                    # because we can enforce input_idx alignment.
-                    
-                    # However, raw_data is linear.
-                    # Input 1 is always at offset 2. Input 2 at offset 4.
-                    
-                    for input_idx, arr_info in input_arrangement.items():
-                        byte_pos = 2 + (input_idx - 1) * 2
-                        
-                        if byte_pos + 1 >= len(raw_data):
-                            break
-                            
-                        # Status is at byte_pos + 1
-                        status_byte = raw_data[byte_pos + 1]
-                        
-                        # Filter disabled/unused inputs (0x0F)
-                        if (status_byte & 0x0F) == 0x0F:
-                            continue
-
-                        data["inputs"][input_idx] = {
-                            "status": status_byte & 0x0F, # Lower nibble as state
-                            "bypassed": bool(status_byte & 0x10), # Bit 4
-                            "low_battery": bool(status_byte & 0x40), # Bit 6 (Guess)
-                            "name": arr_info["name"],
-                            "sensor_type": arr_info.get("sensor_type", 0)
-                        }
-
-                return data
-
-            except UpdateFailed:
-                raise
-            except Exception as err:
-                _LOGGER.error(f"Poll #{poll_num} error: {err}")
-                await client.disconnect()
-                raise UpdateFailed(f"Poll error: {err}")
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name="unii_status",
-        update_method=async_update_data,
-        update_interval=timedelta(seconds=5),
-    )
-    coordinator.client = client 
-    coordinator.input_arrangement = input_arrangement
-    coordinator.operation_lock = operation_lock  # Share lock with entities
+async def _async_keepalive(client: UniiClient):
+    """Keep the panel session up, reconnecting with exponential backoff when it drops.
 
-    await coordinator.async_config_entry_first_refresh()
+    The polls only check client.is_connected, so they never wait on a reconnect.
+    """
+    delay = RECONNECT_DELAY_MIN
+    while True:
+        await client.wait_disconnected()
+        if await client.connect():
+            delay = RECONNECT_DELAY_MIN
+            continue
+        _LOGGER.warning("Reconnect to Unii panel failed, retrying in %ds", delay)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, RECONNECT_DELAY_MAX)
 
-    hass.data[DOMAIN][entry.entry_id] = coordinator
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    
-    entry.async_on_unload(entry.add_update_listener(update_listener))
-    
-    _LOGGER.info(f"=== UNii Integration v{VERSION} loaded successfully ===")
+def _sections_in_transition(sections: dict) -> bool:
+    """Return True while any section runs its exit (3) or entry (4) timer."""
+    return any(state in (3, 4) for state in sections.values())
 
-    return True
+def _section_scan_interval(sections: dict):
+    """Poll fast while a timer runs, so the armed/triggered outcome shows promptly."""
+    if _sections_in_transition(sections):
+        return SECTION_SCAN_INTERVAL_FAST
+    return SECTION_SCAN_INTERVAL
+
+def _parse_sections(raw_data: bytes) -> dict:
+    """Parse a 0x0117 payload: (section_number, armed_state) pairs from offset 0."""
+    return {
+        section_num: section_state
+        for section_num, section_state in _SECTION_PAIR.iter_unpack(_pairs(raw_data))
+        if section_num != 0xFF  # Skip filler/not-programmed
+    }
+
+def _parse_inputs(raw_data: bytes, input_plan: tuple) -> dict:
+    """Parse a 0x0105 payload against the input plan.
+
+    Layout: Version(1)|Reserved(1)|[Reserved][Status] per input, so input 1
+    is at offset 2, input 2 at offset 4, ... The status byte of every pair
+    is taken with one strided slice (done in C), in input order.
+    """
+    inputs = {}
+    for plan_entry, status_byte in zip(input_plan, raw_data[3::2]):
+        if plan_entry is None:  # Not in arrangement
+            continue
+        input_idx, name, sensor_type, known_states = plan_entry
+
+        # Filter disabled/unused inputs (0x0F)
+        decoded = _STATUS_DECODE[status_byte]
+        if decoded is None:
+            continue
+
+        # Reuse the record built the last time this input reported this byte
+        state = known_states.get(status_byte)
+        if state is None:
+            state = known_states[status_byte] = InputState(*decoded, name, sensor_type)
+        inputs[input_idx] = state
+    return inputs
+
+def _arrangement_to_records(input_arrangement: dict) -> dict:
+    """Serialize the arrangement as a sorted list of fixed-size records for storage."""
+    return {
+        "inputs": [
+            [input_idx, info["name"], info.get("sensor_type", 0), info.get("reaction", 0)]
+            for input_idx, info in sorted(input_arrangement.items())
+        ]
+    }
+
+def _arrangement_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    """Return the Store holding the cached arrangement of an entry."""
+    return Store(hass, ARRANGEMENT_STORAGE_VERSION, f"{DOMAIN}_arrangement_{entry.entry_id}")
+
+def _arrangement_from_records(stored: dict | None) -> dict:
+    """Rebuild the arrangement dict from stored records."""
+    if not stored:
+        return {}
+    return {
+        input_idx: {"name": name, "sensor_type": sensor_type, "reaction": reaction}
+        for input_idx, name, sensor_type, reaction in stored.get("inputs", [])
+    }
+
+async def _async_refresh_arrangement_cache(client: UniiClient, store: Store, cached: dict) -> None:
+    """Re-download the arrangement over the live connection and update the cache.
+
+    Changes are used from the next start/reload on, so entities never change
+    under a running setup.
+    """
+    try:
+        if not await client.connect():
+            return
+        arr_data = await client.get_input_arrangement()
+    except Exception as e:
+        _LOGGER.debug("Arrangement refresh failed (non-fatal): %s", e)
+        return
+    input_arrangement = arr_data.get("inputs") if arr_data else None
+    if input_arrangement and input_arrangement != cached:
+        await store.async_save(_arrangement_to_records(input_arrangement))
+        _LOGGER.info("Input arrangement changed on the panel; reload the integration to apply it")
+
+def _build_input_plan(input_arrangement: dict) -> tuple:
+    """Flatten the arrangement into a tuple aligned with the input status pairs.
+
+    Entry N-1 holds (input_idx, name, sensor_type, known_states) for input N,
+    or None when input N is not in the arrangement. known_states maps a status
+    byte to its InputState, so steady-state polls allocate no new records.
+    """
+    plan = [None] * max(input_arrangement, default=0)
+    for input_idx, arr_info in input_arrangement.items():
+        plan[input_idx - 1] = (input_idx, arr_info["name"], arr_info.get("sensor_type", 0), {})
+    return tuple(plan)
+
+def _pairs(raw_data: bytes) -> memoryview:
+    """Return a zero-copy view of raw_data trimmed to whole byte pairs."""
+    return memoryview(raw_data)[:len(raw_data) & ~1]
+
+def _apply_section_events(client: UniiClient, sections: dict, coordinator: DataUpdateCoordinator) -> None:
+    """Merge captured section state change events (physical keypad arm/disarm) into sections."""
+    if not client.section_state_events:
+        return
+    # Replace (not mutate) the overrides so entities notice the change
+    coordinator.state_overrides = {**coordinator.state_overrides, **client.section_state_events}
+    for sec_num, sec_state in client.section_state_events.items():
+        sections[sec_num] = sec_state
+        _LOGGER.debug("Applied section event: section=%s state=%s", sec_num, sec_state)
+    client.section_state_events.clear()
+
+def _get_shared_key(entry: ConfigEntry) -> str | None:
+    """Return the shared key, honouring the override in options."""
+    shared_key = entry.options.get(CONF_SHARED_KEY)
+    return shared_key if shared_key is not None else entry.data.get(CONF_SHARED_KEY)
 
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry):
     """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    runtime_data = entry.runtime_data
+    if entry.data.get(CONF_USER_CODE) != runtime_data.user_code:
+        # The entities hold the user code: rebuild them
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    # A new shared key only needs a fresh handshake, not a full reload
+    shared_key = _get_shared_key(entry)
+    if shared_key != runtime_data.client.shared_key:
+        await runtime_data.client.update_shared_key(shared_key)
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
-        if hasattr(coordinator, 'client'):
-            await coordinator.client.disconnect()
+        # Stop the keepalive first so it does not reopen the session
+        entry.runtime_data.keepalive.cancel()
+        await entry.runtime_data.client.disconnect()
 
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached arrangement when the entry is deleted."""
+    await _arrangement_store(hass, entry).async_remove()
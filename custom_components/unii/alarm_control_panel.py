@@ -1,6 +1,7 @@
 """Support for Unii alarm control panels."""
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
 import asyncio
 import logging
 from homeassistant.components.alarm_control_panel import (
@@ -10,11 +11,13 @@ from homeassistant.components.alarm_control_panel import (
     CodeFormat,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, CONF_USER_CODE
+from .const import CONF_USER_CODE, SECTION_SCAN_INTERVAL
+from .client import _is_valid_code
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,36 +31,76 @@ SECTION_STATE_MAP = {
     4: AlarmControlPanelState.PENDING,       # Entry Timer
     5: AlarmControlPanelState.TRIGGERED,     # Alarm
 }
+# Same mapping as a tuple indexed by the (small, contiguous) state value
+SECTION_STATE_LUT = tuple(SECTION_STATE_MAP[value] for value in range(len(SECTION_STATE_MAP)))
+# Fallback for unknown values and an all-disarmed master, bound once
+_DISARMED = AlarmControlPanelState.DISARMED
+
+# Master priority per state value: triggered > pending > arming > armed > disarmed
+_MASTER_RANK = (0, 1, 0, 2, 3, 4)
+
+
+def _master_rank(state_value: int) -> int:
+    """Rank a section state for the master; unknown values count as disarmed."""
+    if 0 <= state_value < len(_MASTER_RANK):
+        return _MASTER_RANK[state_value]
+    return 0
 
 # Optimistic state overrides — trust arm/disarm command results
+# Kept per config entry on the section coordinator as coordinator.state_overrides.
+# The dict is replaced, never mutated, so entities can cache on its identity.
 # For sections NOT in poll data (e.g. Section 2), overrides persist indefinitely.
 # For sections IN poll data, the polled value takes priority.
 # Format: {section_id: state_value}
-_state_overrides = {}
 
 
-def _set_override(section_id: int, state_value: int):
+def _set_override(coordinator, section_id: int, state_value: int):
     """Set an optimistic state override for a section."""
-    _state_overrides[section_id] = state_value
-    _LOGGER.warning(f"OVERRIDE SET: section {section_id} = {state_value} ({SECTION_STATE_MAP.get(state_value)}), all overrides now: {dict(_state_overrides)}")
-
-
-def _get_effective_state(section_id: int, polled_value) -> int:
-    """Get effective state. Poll data wins when available, otherwise use override."""
-    override_val = _state_overrides.get(section_id)
-    if polled_value is not None:
-        result = polled_value
-        source = "POLL"
-    elif override_val is not None:
-        result = override_val
-        source = "OVERRIDE"
-    else:
-        result = 2
-        source = "DEFAULT"
-    
-    mapped = SECTION_STATE_MAP.get(result, f"UNKNOWN({result})")
-    _LOGGER.warning(f"STATE section={section_id}: {source} -> value={result} ({mapped}) [polled={polled_value}, override={override_val}, all_overrides={dict(_state_overrides)}]")
-    return result
+    overrides = coordinator.state_overrides = {**coordinator.state_overrides, section_id: state_value}
+    _LOGGER.debug(
+        "OVERRIDE SET: section %s = %s (%s), all overrides now: %s",
+        section_id, state_value, SECTION_STATE_MAP.get(state_value), overrides,
+    )
+
+
+def _get_effective_sections(coordinator) -> dict:
+    """Return {section_id: state} with the overrides folded in.
+
+    Poll data wins when available, otherwise the override is used. Sections in
+    neither default to 2 (disarmed) at the caller. The fold is done once per
+    change of coordinator data or overrides and shared by all entities.
+    """
+    data = coordinator.data
+    overrides = coordinator.state_overrides
+    cached = getattr(coordinator, "effective_sections", None)
+    if cached is not None and cached[0] is data and cached[1] is overrides:
+        return cached[2]
+
+    polled = data["sections"] if data and "sections" in data else {}
+    effective = {**overrides, **polled}
+    coordinator.effective_sections = (data, overrides, effective)
+    _LOGGER.debug("Effective sections: %s (polled=%s, overrides=%s)", effective, polled, overrides)
+    return effective
+
+
+# Marks an entity whose state has not been computed yet
+_NOT_CACHED = object()
+
+# Unknown section state values already warned about (logged once each)
+_UNKNOWN_STATES_SEEN: set[int] = set()
+
+
+async def _async_confirm_command(coordinator) -> None:
+    """Reset polling to the base interval and request a debounced confirm poll.
+
+    The backed-off interval is dropped so the outcome keeps being polled at
+    SECTION_SCAN_INTERVAL (a running timer speeds it up further once polled).
+    The first request polls right away, so the panel's own state replaces the
+    optimistic one within the same service call; requests made during the
+    debounce cooldown share a single trailing poll.
+    """
+    coordinator.update_interval = SECTION_SCAN_INTERVAL
+    await coordinator.async_request_refresh()
 
 
 async def async_setup_entry(
@@ -66,204 +109,197 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Unii alarm control panel from a config entry."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
-    
-    _LOGGER.warning(f"STATE MAP: 1={SECTION_STATE_MAP[1]}, 2={SECTION_STATE_MAP[2]}")
+    coordinator = entry.runtime_data.sections
     
+    # Resolve the configured user code once for all entities
+    raw_code = entry.data.get(CONF_USER_CODE)
+    user_code = str(raw_code).strip() if raw_code else None
+    if user_code and not _is_valid_code(user_code):
+        # The panel takes up to 16 BCD digits; ask for the code instead
+        _LOGGER.error("Configured user code is not 1-16 digits; it will be asked for on each action")
+        user_code = None
+
     sections = [
-        UniiAlarm(coordinator, 1, "Section 1", entry),
-        UniiAlarm(coordinator, 2, "Section 2", entry),
-        UniiMasterAlarm(coordinator, [1, 2], "Master", entry),
+        UniiAlarm(coordinator, 1, "Section 1", entry, user_code),
+        UniiAlarm(coordinator, 2, "Section 2", entry, user_code),
+        UniiMasterAlarm(coordinator, (1, 2), "Master", entry, user_code),
     ]
     
     async_add_entities(sections)
 
 
-class UniiAlarm(CoordinatorEntity, AlarmControlPanelEntity):
-    """Representation of a Unii section alarm."""
+class _UniiAlarmBase(CoordinatorEntity, AlarmControlPanelEntity, ABC):
+    """Behaviour shared by the section and master alarm panels."""
 
     _attr_has_entity_name = True
     _attr_supported_features = (
         AlarmControlPanelEntityFeature.ARM_AWAY
     )
 
-    def __init__(self, coordinator, section_id: int, name_suffix: str, entry: ConfigEntry) -> None:
+    _cached_data = _NOT_CACHED
+    _cached_overrides = None
+    _cached_state = None
+    _written_state = None
+
+    def __init__(self, coordinator, name_suffix: str, unique_id: str, user_code: str | None) -> None:
         super().__init__(coordinator)
-        self.section_id = section_id
         self._attr_name = name_suffix
-        self._attr_unique_id = f"{entry.entry_id}_section_{section_id}"
-        
-        raw_code = entry.data.get(CONF_USER_CODE)
-        self._user_code = str(raw_code).strip() if raw_code else None
+        self._attr_unique_id = unique_id
         
-        if self._user_code:
-             self._attr_code_format = None
-        else:
-             self._attr_code_format = CodeFormat.NUMBER
-
-    @property
-    def code_format(self) -> CodeFormat | None:
-        if self._user_code:
-            return None
-        return CodeFormat.NUMBER
-
-    @property
-    def code_arm_required(self) -> bool:
-        return not bool(self._user_code)
+        self._user_code = user_code
+        # Ask for a code only when none is configured
+        self._attr_code_format = None if user_code else CodeFormat.NUMBER
+        self._attr_code_arm_required = not user_code
 
     @property
     def state(self) -> AlarmControlPanelState | None:
-        if not self.coordinator.data or "sections" not in self.coordinator.data:
-            return None
-            
-        polled_state = self.coordinator.data["sections"].get(self.section_id)
-        
-        # _get_effective_state handles None polled_state (uses override if available)
-        effective_state = _get_effective_state(self.section_id, polled_state)
-        
-        mapped = SECTION_STATE_MAP.get(effective_state)
-        if mapped is None:
-            _LOGGER.warning(f"Section {self.section_id}: Unknown state {effective_state}")
-            return AlarmControlPanelState.DISARMED
-        
-        return mapped
+        # HA reads state several times per update: recompute only when the
+        # coordinator data or the overrides were replaced
+        coordinator = self.coordinator
+        data = coordinator.data
+        overrides = coordinator.state_overrides
+        if data is not self._cached_data or overrides is not self._cached_overrides:
+            self._cached_state = self._compute_state()
+            self._cached_data = data
+            self._cached_overrides = overrides
+        return self._cached_state
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # The coordinator notifies every entity when any section changed:
+        # only write when what this entity shows actually changed
+        if (self.available, self.state) != self._written_state:
+            self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        self._written_state = (self.available, self.state)
+        super().async_write_ha_state()
+
+    @abstractmethod
+    def _compute_state(self) -> AlarmControlPanelState | None:
+        """Return the panel state from the effective section states."""
 
     async def async_alarm_disarm(self, code=None) -> None:
-        _LOGGER.warning(f">>> DISARM CALLED on entity {self._attr_unique_id} (section {self.section_id})")
-        use_code = code if code else self._user_code
-        if not use_code:
-            _LOGGER.error("No code provided for disarm.")
-            return
-
-        async with self.coordinator.operation_lock:
-            client = self.coordinator.client
-            if not await client.connect():
-                _LOGGER.error(f"Cannot disarm section {self.section_id}: not connected")
-                return
-            result = await client.disarm_section(self.section_id, use_code)
-            _LOGGER.warning(f"Disarm section {self.section_id} result: {result}")
-            
-            if result:
-                _set_override(self.section_id, 2)  # 2 = disarmed
-        
-        # Force UI update
-        self.async_write_ha_state()
+        await self._async_control(code, "disarm", 2)  # 2 = disarmed
 
     async def async_alarm_arm_away(self, code=None) -> None:
-        _LOGGER.warning(f">>> ARM CALLED on entity {self._attr_unique_id} (section {self.section_id})")
+        await self._async_control(code, "arm", 1)  # 1 = armed
+
+    async def _async_control(self, code, action: str, state_value: int) -> None:
+        """Send an arm/disarm command, show the optimistic state and confirm it."""
+        _LOGGER.debug(">>> %s CALLED on entity %s", action.upper(), self._attr_unique_id)
         use_code = code if code else self._user_code
         if not use_code:
-            _LOGGER.error("No code provided for arm.")
-            return
-
-        async with self.coordinator.operation_lock:
-            client = self.coordinator.client
-            if not await client.connect():
-                _LOGGER.error(f"Cannot arm section {self.section_id}: not connected")
-                return
-            result = await client.arm_section(self.section_id, use_code)
-            _LOGGER.warning(f"Arm section {self.section_id} result: {result}")
+            _LOGGER.error("No code provided for %s.", action)
+            raise HomeAssistantError(f"No code provided for {action}")
+        use_code = str(use_code)
+        if not _is_valid_code(use_code):
+            _LOGGER.error("Invalid code for %s: expected 1-16 digits", action)
+            raise HomeAssistantError(f"Invalid code for {action}: expected 1-16 digits")
+
+        client = self.coordinator.client
+        if not await client.connect():
+            _LOGGER.error("Cannot %s %s: not connected", action, self._attr_name)
+            raise HomeAssistantError(f"Cannot {action} {self._attr_name}: not connected to the Unii panel")
+        command = client.arm_section if action == "arm" else client.disarm_section
+        failed = await self._async_send(command, use_code, state_value)
+
+        # Fold the acknowledged state into the data: polled values outrank
+        # the overrides, so only this shows it on every panel (the master
+        # included) before the confirming poll's round trip
+        acknowledged = {sid: state_value for sid in self.section_ids if sid not in failed}
+        if acknowledged:
+            self.coordinator.async_push_sections(acknowledged)
+        # An acknowledged arm is usually an exit timer on the panel: the
+        # confirming poll replaces the assumed state with the real one
+        await _async_confirm_command(self.coordinator)
+        if failed:
+            # Sections that did respond keep their new state; report the rest
+            _LOGGER.error("%s failed for section(s) %s", action.capitalize(), failed)
+            raise HomeAssistantError(
+                f"{action.capitalize()} failed for section(s) {', '.join(map(str, failed))}"
+            )
+
+    @abstractmethod
+    async def _async_send(self, command, use_code: str, state_value: int) -> list[int]:
+        """Send the command to this panel's section(s); return the ids that failed."""
+
+
+class UniiAlarm(_UniiAlarmBase):
+    """Representation of a Unii section alarm."""
+
+    def __init__(self, coordinator, section_id: int, name_suffix: str, entry: ConfigEntry, user_code: str | None) -> None:
+        super().__init__(coordinator, name_suffix, f"{entry.entry_id}_section_{section_id}", user_code)
+        self.section_id = section_id
+        self.section_ids = (section_id,)
+
+    def _compute_state(self) -> AlarmControlPanelState | None:
+        coordinator = self.coordinator
+        data = coordinator.data
+        if not data or "sections" not in data:
+            return None
             
-            if result:
-                _set_override(self.section_id, 1)  # 1 = armed
+        effective_state = _get_effective_sections(coordinator).get(self.section_id, 2)
         
-        # Force UI update
-        self.async_write_ha_state()
+        if 0 <= effective_state < len(SECTION_STATE_LUT):
+            return SECTION_STATE_LUT[effective_state]
 
+        if effective_state not in _UNKNOWN_STATES_SEEN:
+            _UNKNOWN_STATES_SEEN.add(effective_state)
+            _LOGGER.warning("Section %s: Unknown state %s", self.section_id, effective_state)
+        return _DISARMED
 
-class UniiMasterAlarm(CoordinatorEntity, AlarmControlPanelEntity):
-    """Representation of a Unii master alarm controlling all sections."""
-
-    _attr_has_entity_name = True
-    _attr_supported_features = (
-        AlarmControlPanelEntityFeature.ARM_AWAY
-    )
+    async def _async_send(self, command, use_code: str, state_value: int) -> list[int]:
+        result = await command(self.section_id, use_code)
+        _LOGGER.debug("Section %s command result: %s", self.section_id, result)
+        if not result:
+            return [self.section_id]
+        _set_override(self.coordinator, self.section_id, state_value)
+        return []
 
-    def __init__(self, coordinator, section_ids: list[int], name_suffix: str, entry: ConfigEntry) -> None:
-        super().__init__(coordinator)
-        self.section_ids = section_ids
-        self._attr_name = name_suffix
-        self._attr_unique_id = f"{entry.entry_id}_master"
-        
-        raw_code = entry.data.get(CONF_USER_CODE)
-        self._user_code = str(raw_code).strip() if raw_code else None
-        
-        if self._user_code:
-             self._attr_code_format = None
-        else:
-             self._attr_code_format = CodeFormat.NUMBER
 
-    @property
-    def code_format(self) -> CodeFormat | None:
-        if self._user_code:
-            return None
-        return CodeFormat.NUMBER
+class UniiMasterAlarm(_UniiAlarmBase):
+    """Representation of a Unii master alarm controlling all sections."""
 
-    @property
-    def code_arm_required(self) -> bool:
-        return not bool(self._user_code)
+    def __init__(self, coordinator, section_ids: tuple[int, ...], name_suffix: str, entry: ConfigEntry, user_code: str | None) -> None:
+        super().__init__(coordinator, name_suffix, f"{entry.entry_id}_master", user_code)
+        self.section_ids = section_ids
 
-    @property
-    def state(self) -> AlarmControlPanelState | None:
-        if not self.coordinator.data or "sections" not in self.coordinator.data:
+    def _compute_state(self) -> AlarmControlPanelState | None:
+        coordinator = self.coordinator
+        data = coordinator.data
+        if not data or "sections" not in data:
             return None
             
-        states = []
+        effective = _get_effective_sections(coordinator)
+
+        # Single pass with a plain accumulator: the highest-priority section
+        # state decides
+        top = None
+        top_rank = -1
         for sid in self.section_ids:
-            polled = self.coordinator.data["sections"].get(sid)
-            effective = _get_effective_state(sid, polled)
-            states.append(effective)
-        
-        if not states:
+            state_value = effective.get(sid, 2)
+            rank = _master_rank(state_value)
+            if rank > top_rank:
+                top, top_rank = state_value, rank
+        if top is None:
             return None
-
-        if 5 in states:
-            return AlarmControlPanelState.TRIGGERED
-        if 4 in states:
-            return AlarmControlPanelState.PENDING
-        if 3 in states:
-            return AlarmControlPanelState.ARMING
-        if any(s == 1 for s in states):
-            return AlarmControlPanelState.ARMED_AWAY
-        
-        return AlarmControlPanelState.DISARMED
-
-    async def async_alarm_disarm(self, code=None) -> None:
-        use_code = code if code else self._user_code
-        if not use_code:
-            _LOGGER.error("No code provided for disarm.")
-            return
-
-        async with self.coordinator.operation_lock:
-            client = self.coordinator.client
-            if not await client.connect():
-                _LOGGER.error("Cannot disarm: not connected")
-                return
-            for sid in self.section_ids:
-                _LOGGER.warning(f"Master: Disarming section {sid}...")
-                result = await client.disarm_section(sid, use_code)
-                _LOGGER.warning(f"Master: Disarm section {sid} result: {result}")
-                if result:
-                    _set_override(sid, 2)  # 2 = disarmed
-        
-        self.async_write_ha_state()
-
-    async def async_alarm_arm_away(self, code=None) -> None:
-        use_code = code if code else self._user_code
-        if not use_code:
-            _LOGGER.error("No code provided for arm.")
-            return
-
-        async with self.coordinator.operation_lock:
-            client = self.coordinator.client
-            if not await client.connect():
-                _LOGGER.error("Cannot arm: not connected")
-                return
-            for sid in self.section_ids:
-                _LOGGER.warning(f"Master: Arming section {sid}...")
-                result = await client.arm_section(sid, use_code)
-                _LOGGER.warning(f"Master: Arm section {sid} result: {result}")
-                if result:
-                    _set_override(sid, 1)  # 1 = armed
-        
-        self.async_write_ha_state()
+        if top_rank == 0:
+            return _DISARMED
+        return SECTION_STATE_LUT[top]
+
+    async def _async_send(self, command, use_code: str, state_value: int) -> list[int]:
+        # Send to all sections at once; responses are matched per request
+        results = await asyncio.gather(
+            *(command(sid, use_code) for sid in self.section_ids),
+            return_exceptions=True,
+        )
+        failed = []
+        for sid, result in zip(self.section_ids, results):
+            _LOGGER.debug("Master: section %s command result: %s", sid, result)
+            if result is True:
+                _set_override(self.coordinator, sid, state_value)
+            else:
+                failed.append(sid)
+        return failed
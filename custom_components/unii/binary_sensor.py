@@ -15,93 +15,116 @@
 # limitations under the License.
 #
 """Binary sensor platform for Unii alarm system inputs."""
+from abc import ABC, abstractmethod
 import logging
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
 )
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.const import EntityCategory
 
-from .const import DOMAIN
-
 _LOGGER = logging.getLogger(__name__)
 
+
+def _input_record(coordinator, input_id):
+    """Return the current InputState of an input, or None."""
+    data = coordinator.data
+    if not data or "inputs" not in data:
+        return None
+    return data["inputs"].get(input_id)
+
+
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up the Unii binary sensor platform."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry.runtime_data.inputs
     
     await coordinator.async_config_entry_first_refresh()
     
-    entities = []
-    if coordinator.data and "inputs" in coordinator.data:
-        for input_id, record in coordinator.data["inputs"].items():
-            entities.append(UniiInputBinarySensor(coordinator, input_id))
-            entities.append(UniiTamperBinarySensor(coordinator, input_id))
-            
+    entities = [
+        sensor
+        for input_id in coordinator.data["inputs"]
+        for sensor in (
+            UniiInputBinarySensor(coordinator, input_id),
+            UniiTamperBinarySensor(coordinator, input_id),
+        )
+    ]
     async_add_entities(entities)
 
-class UniiInputBinarySensor(CoordinatorEntity, BinarySensorEntity):
+class _UniiInputEntity(CoordinatorEntity, ABC):
+    """Coordinator entity that only writes when its own input record changed."""
+
+    _record = None
+    _written = None
+
+    @abstractmethod
+    def _update_from_record(self, record) -> None:
+        """Set the entity's state attributes from its input record (or None)."""
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # The coordinator notifies every input when any of them changed; records
+        # are interned per status byte, so an unchanged input compares by identity
+        record = _input_record(self.coordinator, self._input_id)
+        if (self.available, record) == self._written:
+            return
+        self._record = record
+        self._update_from_record(record)
+        self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        self._written = (self.available, self._record)
+        super().async_write_ha_state()
+
+class UniiInputBinarySensor(_UniiInputEntity, BinarySensorEntity):
     """Binary sensor for Unii inputs (Zones)."""
 
+    _attr_device_class = BinarySensorDeviceClass.MOTION
+
     def __init__(self, coordinator, input_id):
         super().__init__(coordinator)
         self._input_id = input_id
         # Get name from current data or arrangement
-        record = coordinator.data.get("inputs", {}).get(input_id, {})
-        name = record.get("name", f"Input {input_id}")
+        record = coordinator.data.get("inputs", {}).get(input_id)
+        name = record.name if record else f"Input {input_id}"
         self._attr_name = name
         self._attr_unique_id = f"{coordinator.config_entry.entry_id}_input_{input_id}"
-        self._attr_device_class = BinarySensorDeviceClass.MOTION
-        
-    @property
-    def is_on(self):
-        """Return true if the input is open/active."""
-        if not self.coordinator.data or "inputs" not in self.coordinator.data:
-            return False
-        status_record = self.coordinator.data["inputs"].get(self._input_id)
-        if not status_record:
-            return False
+        self._record = record
+        self._update_from_record(record)
+
+    def _update_from_record(self, record) -> None:
+        """Derive the state attributes once per record instead of per read."""
+        if not record:
+            self._attr_is_on = False
+            self._attr_extra_state_attributes = {}
+            return
         # Check ANY non-zero status in lower nibble (Alarm, Tamper, Mask, Trouble)
-        return (status_record["status"] & 0x0F) > 0
-
-    @property
-    def extra_state_attributes(self):
-        """Return input attributes."""
-        if not self.coordinator.data or "inputs" not in self.coordinator.data:
-            return {}
-        status_record = self.coordinator.data["inputs"].get(self._input_id)
-        if not status_record:
-            return {}
-        return {
-            "bypassed": status_record.get("bypassed", False),
-            "tamper": (status_record["status"] & 0x02) == 0x02,
-            "masking": (status_record["status"] & 0x04) == 0x04,
-            "low_battery": status_record.get("low_battery", False),
+        self._attr_is_on = (record.status & 0x0F) > 0
+        self._attr_extra_state_attributes = {
+            "bypassed": record.bypassed,
+            "tamper": (record.status & 0x02) == 0x02,
+            "masking": (record.status & 0x04) == 0x04,
+            "low_battery": record.low_battery,
         }
 
-class UniiTamperBinarySensor(CoordinatorEntity, BinarySensorEntity):
+class UniiTamperBinarySensor(_UniiInputEntity, BinarySensorEntity):
     """Binary sensor for Unii input tamper status."""
 
+    _attr_device_class = BinarySensorDeviceClass.TAMPER
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
     def __init__(self, coordinator, input_id):
         super().__init__(coordinator)
         self._input_id = input_id
-        record = coordinator.data.get("inputs", {}).get(input_id, {})
-        name = record.get("name", f"Input {input_id}")
+        record = coordinator.data.get("inputs", {}).get(input_id)
+        name = record.name if record else f"Input {input_id}"
         self._attr_name = f"{name} Tamper"
         self._attr_unique_id = f"{coordinator.config_entry.entry_id}_input_{input_id}_tamper"
-        self._attr_device_class = BinarySensorDeviceClass.TAMPER
-    @property
-    def entity_category(self):
-        """Return the category of the entity."""
-        return EntityCategory.DIAGNOSTIC
-
-    @property
-    def is_on(self):
-        """Return true if the input is in tamper."""
-        if not self.coordinator.data or "inputs" not in self.coordinator.data:
-            return False
-        status_record = self.coordinator.data["inputs"].get(self._input_id)
-        if not status_record:
-            return False
-        return (status_record["status"] & 0x02) == 0x02
+        self._record = record
+        self._update_from_record(record)
+
+    def _update_from_record(self, record) -> None:
+        """Derive the tamper state once per record instead of per read."""
+        self._attr_is_on = bool(record) and (record.status & 0x02) == 0x02
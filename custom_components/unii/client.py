@@ -20,12 +20,56 @@ import socket
 import struct
 import binascii
 import logging
-from typing import Optional, Dict, Any, Tuple
-from Crypto.Cipher import AES
-from Crypto.Util import Counter
+from collections import deque
+from typing import Optional, Dict, Any, Deque, Callable
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
 _LOGGER = logging.getLogger(__name__)
 
+# Consecutive record-less arrangement blocks that end the scan
+ARRANGEMENT_EMPTY_BLOCKS = 2
+# Arrangement block requests kept in flight at once
+ARRANGEMENT_WINDOW = 4
+
+
+# Packet layouts, compiled once: header is session(2) tx_seq(4) rx_seq(4)
+# proto(1) type(1) length(2); the payload starts with cmd(2) data_len(2)
+_HEADER = struct.Struct(">HIIBBH")
+_CMD_HEADER = struct.Struct(">HH")
+_FRAME_START = struct.Struct(_HEADER.format + _CMD_HEADER.format[1:])
+# Big-endian 16-bit field (CRC, block number, input id)
+_U16 = struct.Struct(">H")
+# Input arrangement record (44 per block, after a 3-byte block header):
+# unknown(1) sensor_type(1) reaction(1) name(16) unused(3)
+_ARRANGEMENT_RECORD = struct.Struct(">xBB16s3x")
+
+# Command payloads: 0x00 | BCD user code(8) | section id(1) | 0x01 for
+# arm/disarm, 0x00 | BCD user code(8) | input id(2) for (un)bypass
+_SECTION_CONTROL = struct.Struct(">B8sBB")
+_INPUT_CONTROL = struct.Struct(">B8sH")
+
+# Distinct user codes whose BCD encoding is kept (oldest evicted first)
+BCD_CACHE_SIZE = 16
+
+
+def _is_valid_code(code: str) -> bool:
+    """Return True for a code the panel accepts: 1-16 ASCII digits (BCD encoded)."""
+    # isdigit() alone also accepts e.g. "²" or Arabic-Indic digits
+    return code.isascii() and code.isdigit() and len(code) <= 16
+
+
+class _LazyHex:
+    """Render bytes as hex only when a log record is actually emitted."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def __str__(self) -> str:
+        return self.data.hex() if self.data else "empty"
+
+
 class UniiClient:
     def __init__(self, ip: str, port: int = 6502, shared_key: Optional[str] = None):
         self.ip = ip
@@ -38,13 +82,52 @@ class UniiClient:
         self.rx_seq = 0
         self._connected = False
         self._lock = asyncio.Lock()
-        self._transaction_lock = asyncio.Lock()
+        # Serializes frame emission only; responses are matched by command id,
+        # so requests no longer wait for each other's round trip
+        self._write_lock = asyncio.Lock()
         # Captures SECTION_ARMED_STATE_CHANGED (0x0119) events from the panel
         # Format: {section_number: armed_state}
         self.section_state_events: Dict[int, int] = {}
-        
+        # Called (without arguments) whenever a new section state event is captured
+        self.on_section_event: Optional[Callable[[], None]] = None
+        # Background task that owns the socket reader
+        self._reader_task: Optional[asyncio.Task] = None
+        # Requests waiting for their response, FIFO per expected command
+        # (None = accept any command, used by the handshake)
+        self._pending: Dict[Optional[int], Deque[asyncio.Future]] = {}
+        # Set while there is no session; the integration's keepalive waits on it
+        self._disconnected = asyncio.Event()
+        self._disconnected.set()
+        # BCD encodings of the user codes seen so far
+        self._bcd_cache: Dict[str, bytes] = {}
+
+    @property
+    def shared_key(self) -> Optional[str]:
+        return self._shared_key
+
+    @shared_key.setter
+    def shared_key(self, shared_key: Optional[str]):
+        self._shared_key = shared_key
+        # Built by connect(), where a key the cipher rejects (e.g. non-ASCII
+        # characters changing its byte length) fails the connection instead
+        # of the caller constructing the client
+        self._aes_key = None
+
+    @property
+    def is_connected(self) -> bool:
+        """Return True while the session is up (a flag check, no I/O)."""
+        return self._connected and self.writer is not None and not self.writer.is_closing()
+
+    async def wait_disconnected(self):
+        """Wait until the session is lost or closed."""
+        await self._disconnected.wait()
+
     async def connect(self) -> bool:
         """Establish connection to the panel and perform handshake."""
+        # Fast path: already connected, no need to queue on the connect lock
+        if self.is_connected:
+            return True
+
         async with self._lock:
             if self._connected and self.writer:
                 try:
@@ -56,7 +139,7 @@ class UniiClient:
 
             # Try connecting, with one retry if panel denies (stale slot)
             for attempt in range(2):
-                _LOGGER.info(f"Connecting to {self.ip}:{self.port}... (attempt {attempt + 1})")
+                _LOGGER.info("Connecting to %s:%s... (attempt %s)", self.ip, self.port, attempt + 1)
                 try:
                     self.reader, self.writer = await asyncio.wait_for(
                         asyncio.open_connection(self.ip, self.port), timeout=5
@@ -68,37 +151,47 @@ class UniiClient:
                         sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
                         try:
                             # Linux (where HA runs)
-                            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60)
+                            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
                             sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)
                             sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
                         except (AttributeError, OSError):
                             try:
                                 # Windows fallback
-                                sock.ioctl(socket.SIO_KEEPALIVE_VALS, (1, 60000, 10000))
+                                sock.ioctl(socket.SIO_KEEPALIVE_VALS, (1, 30000, 10000))
                             except (AttributeError, OSError):
                                 pass  # Basic keepalive already enabled
-                        _LOGGER.debug("TCP keepalive enabled (60s idle, 10s interval)")
+                        _LOGGER.debug("TCP keepalive enabled (30s idle, 10s interval)")
+
+                    # AES key (first 16 characters, space padded), set up once per
+                    # connection instead of on every packet
+                    self._aes_key = (
+                        algorithms.AES(self.shared_key[:16].ljust(16, " ").encode("utf-8"))
+                        if self.shared_key else None
+                    )
+
+                    # All inbound packets are read by a single background task
+                    self._reader_task = asyncio.create_task(self._reader_loop(self.reader))
 
                     # Handshake: Send 0x0001, accept any response
-                    if await self._send_command(0x0001):
-                        resp = await self._recv_response()  # Accept any cmd
-                        if resp:
-                            cmd = resp.get('command', 0)
-                            if cmd == 0x0002:
-                                _LOGGER.info("Connected and Authenticated!")
-                                self._connected = True
-                                return True
-                            elif cmd == 0x0003:
-                                _LOGGER.warning("Connection DENIED by panel (slot busy). Retrying in 3s...")
-                                await self._close_socket()
-                                await asyncio.sleep(3)
-                                continue
-                            else:
-                                _LOGGER.error(f"Unexpected handshake response: 0x{cmd:04x}")
+                    resp = await self._transact(0x0001)  # Accept any cmd
+                    if resp:
+                        cmd = resp.get('command', 0)
+                        if cmd == 0x0002:
+                            _LOGGER.info("Connected and Authenticated!")
+                            self._connected = True
+                            self._disconnected.clear()
+                            return True
+                        elif cmd == 0x0003:
+                            _LOGGER.warning("Connection DENIED by panel (slot busy). Retrying in 3s...")
+                            await self._close_socket()
+                            await asyncio.sleep(3)
+                            continue
+                        else:
+                            _LOGGER.error("Unexpected handshake response: 0x%04x", cmd)
 
                     await self._close_socket()
                 except Exception as e:
-                    _LOGGER.error(f"Connection failed: {e}")
+                    _LOGGER.error("Connection failed: %s", e)
                     await self._close_socket()
 
             return False
@@ -109,15 +202,29 @@ class UniiClient:
             # Send graceful disconnect so panel frees the connection slot
             if self._connected and self.writer:
                 try:
-                    await self._send_command(0x0014)  # NORMAL_DISCONNECT
+                    async with self._write_lock:
+                        await self._send_command(0x0014)  # NORMAL_DISCONNECT
                     await asyncio.sleep(0.2)  # Brief pause for panel to process
                 except Exception:
                     pass
             await self._close_socket()
             _LOGGER.info("Disconnected.")
 
+    async def update_shared_key(self, shared_key: Optional[str]):
+        """Switch to a new shared key; the next request reconnects with it."""
+        await self.disconnect()
+        self.shared_key = shared_key
+
     async def _close_socket(self):
         """Internal socket cleanup."""
+        task, self._reader_task = self._reader_task, None
+        if task and task is not asyncio.current_task():
+            task.cancel()
+        pending, self._pending = self._pending, {}
+        for queue in pending.values():
+            for fut in queue:
+                if not fut.done():
+                    fut.set_result(None)
         if self.writer:
             try:
                 self.writer.close()
@@ -130,37 +237,29 @@ class UniiClient:
         self.session_id = 0xFFFF
         self.tx_seq = 0
         self.rx_seq = 0
+        self._disconnected.set()
 
-    def _encrypt(self, payload: bytearray, header: bytearray) -> bytearray:
-        """Encrypt payload using AES-CTR if shared_key is set."""
-        if not self.shared_key:
-            return payload
-            
-        key_padded = self.shared_key[:16].ljust(16, " ")
-        key_bytes = key_padded.encode("utf-8")
-        
-        # IV = First 12 bytes of Header + 00000000
-        iv = header[:12] + b'\x00\x00\x00\x00'
+    def _new_cipher(self, header):
+        """Return the AES-CTR cipher context for a packet, or None when encryption is off."""
+        if self._aes_key is None:
+            return None
         
-        ctr = Counter.new(128, initial_value=int.from_bytes(iv, 'big'))
-        cipher = AES.new(key_bytes, AES.MODE_CTR, counter=ctr)
-        return bytearray(cipher.encrypt(payload))
-
-    def _decrypt(self, payload_enc: bytes, header: bytearray) -> bytearray:
-        return self._encrypt(bytearray(payload_enc), header)
-
-    def _calculate_crc16(self, data: bytearray) -> int:
-        crc = 0x0000
-        poly = 0x1021
-        for byte in data:
-            crc ^= byte << 8
-            for _ in range(8):
-                if (crc & 0x8000) > 0:
-                    crc = (crc << 1) ^ poly
-                else:
-                    crc <<= 1
-            crc &= 0xFFFF
-        return crc
+        # IV = First 12 bytes of Header + 00000000: the header bytes are the
+        # nonce and the last 4 bytes the block counter, starting at 0
+        return Cipher(self._aes_key, modes.CTR(bytes(header[:12]) + b"\x00\x00\x00\x00")).encryptor()
+
+    def _decrypt(self, payload_enc, header: bytes) -> bytes:
+        """Decrypt a received payload (any bytes-like) using AES-CTR if shared_key is set."""
+        cipher = self._new_cipher(header)
+        if cipher is None:
+            return bytes(payload_enc)
+        # CTR: decrypting is the same keystream XOR as encrypting
+        return cipher.update(payload_enc)
+
+    @staticmethod
+    def _calculate_crc16(data) -> int:
+        """CRC-16/CCITT (poly 0x1021, init 0), i.e. CRC-16/XMODEM, computed in C."""
+        return binascii.crc_hqx(data, 0)
 
     async def _send_command(self, command_id: int, data: bytes = b"") -> bool:
         """Construct and send a packet."""
@@ -170,121 +269,161 @@ class UniiClient:
         proto_id = 0x05 if self.shared_key else 0x04
         packet_type = 0x01 if command_id < 0x0008 else 0x02
         
-        # Header (14 bytes)
-        header = struct.pack(">HIIBB", self.session_id, self.tx_seq, self.rx_seq, proto_id, packet_type) + b'\x00\x00'
-        header = bytearray(header)
+        # Sizes: Header(14) | Payload: cmd(2) len(2) data, zero padded | CRC(2),
+        # padded so the whole packet is a multiple of 16 bytes
+        data_len = len(data)
+        pad_len = (16 - ((14 + 4 + data_len + 2) % 16)) % 16
+        total_len = 14 + 4 + data_len + pad_len + 2
         
-        # Payload
-        payload = bytearray(struct.pack(">HH", command_id, len(data)) + data)
+        # Build the packet in one buffer: header (with its final length) and
+        # payload header in one pack, then the data; padding is already zero
+        # (plus AES block size - 1 spare bytes: older cryptography releases
+        # require that much room in update_into's output buffer)
+        msg = bytearray(total_len + 15)
+        _FRAME_START.pack_into(
+            msg, 0,
+            self.session_id, self.tx_seq, self.rx_seq, proto_id, packet_type, total_len,
+            command_id, data_len,
+        )
+        msg[18:18 + data_len] = data
         
-        # Padding
-        packet_len_temp = len(header) + len(payload) + 2
-        pad_len = (16 - (packet_len_temp % 16)) % 16
-        payload += b'\x00' * pad_len
+        # Encrypt the payload in place (the IV only uses header bytes 0-11)
+        cipher = self._new_cipher(msg)
+        if cipher is not None:
+            view = memoryview(msg)
+            cipher.update_into(view[14:total_len - 2], view[14:])
         
-        # Encrypt
-        payload_enc = self._encrypt(payload, header)
-        msg = header + payload_enc
-        
-        # Update Length in Header (Indices 12, 13)
-        total_len = len(msg) + 2
-        msg[12] = (total_len >> 8) & 0xFF
-        msg[13] = total_len & 0xFF
-        
-        # Checksum
-        crc = self._calculate_crc16(msg)
-        msg += struct.pack(">H", crc)
+        # Checksum over everything before it
+        _U16.pack_into(msg, total_len - 2, self._calculate_crc16(memoryview(msg)[:total_len - 2]))
         
         try:
-            self.writer.write(msg)
+            self.writer.write(memoryview(msg)[:total_len])
             await self.writer.drain()
             self.tx_seq += 1
             return True
         except Exception as e:
-            _LOGGER.error(f"Send Failed: {e}")
+            _LOGGER.error("Send Failed: %s", e)
             await self._close_socket()
             return False
 
-    async def _recv_response(self, expected_cmd: Optional[int] = None, timeout: int = 5) -> Optional[Dict[str, Any]]:
-        """Receive response, filtering out unexpected events (race condition fix)."""
-        if not self.reader:
+    async def _transact(self, command_id: int, data: bytes = b"", expected_cmd: Optional[int] = None, timeout: int = 5,
+                        close_on_timeout: bool = True) -> Optional[Dict[str, Any]]:
+        """Send a command and wait for the reader task to hand over its response.
+
+        Several requests may be in flight at once; the reader routes each
+        response to the oldest request waiting for that command. A timeout
+        drops the connection unless close_on_timeout is False, for requests
+        the panel may legitimately leave unanswered.
+        """
+        if not self.writer:
             return None
-            
-        max_retries = 10 
-        start_time = asyncio.get_running_loop().time()
 
-        for attempt in range(max_retries):
-            # Check total timeout
-            if asyncio.get_running_loop().time() - start_time > timeout:
-                _LOGGER.warning(f"Timeout waiting for CMD 0x{expected_cmd:04x}")
+        fut = asyncio.get_running_loop().create_future()
+        queue = None
+        try:
+            async with self._write_lock:
+                # Register under the write lock so queue order matches wire order
+                queue = self._pending.setdefault(expected_cmd, deque())
+                queue.append(fut)
+                if not await self._send_command(command_id, data):
+                    return None
+            return await asyncio.wait_for(fut, timeout=timeout)
+        except asyncio.TimeoutError:
+            expected_str = f"0x{expected_cmd:04x}" if expected_cmd is not None else "any"
+            if not close_on_timeout:
+                _LOGGER.debug("No response for CMD %s", expected_str)
                 return None
+            _LOGGER.error("Timeout waiting for CMD %s", expected_str)
+            await self._close_socket()
+            return None
+        finally:
+            if queue is not None and fut in queue:
+                queue.remove(fut)
 
-            try:
-                # Calculate remaining time for this read operation
-                remaining_time = timeout - (asyncio.get_running_loop().time() - start_time)
-                if remaining_time <= 0: return None
+    async def _reader_loop(self, reader: asyncio.StreamReader):
+        """Read every inbound packet and route it to the waiting request or the event handlers.
 
+        Runs for the lifetime of the connection, so panel events (e.g. physical keypad
+        arm/disarm) are picked up as soon as they arrive instead of at the next poll.
+        """
+        try:
+            while True:
                 # Header
-                header_bytes = await asyncio.wait_for(self.reader.readexactly(14), timeout=remaining_time)
-                header = bytearray(header_bytes)
-                length = struct.unpack(">H", header[12:14])[0]
-                
+                header_bytes = await reader.readexactly(14)
+                session_id, tx_seq, _, _, _, length = _HEADER.unpack(header_bytes)
+
                 # Check sane length
                 if length < 16 or length > 4096:
-                    _LOGGER.error(f"Invalid packet length: {length}")
-                    return None
+                    _LOGGER.error("Invalid packet length: %s", length)
+                    break
 
                 remaining_bytes = length - 14
-                body = await asyncio.wait_for(self.reader.readexactly(remaining_bytes), timeout=remaining_time)
-                
-                # Decrypt
-                payload_enc = body[:-2]
-                payload_dec = self._decrypt(payload_enc, header)
-                
-                cmd_id = struct.unpack(">H", payload_dec[:2])[0]
-                data_len = struct.unpack(">H", payload_dec[2:4])[0]
+                body = await reader.readexactly(remaining_bytes)
+
+                # Decrypt straight from the read buffer (CRC excluded), no copies
+                payload_dec = self._decrypt(memoryview(body)[:-2], header_bytes)
+
+                # Read fields in place instead of slicing a copy for each one
+                cmd_id, data_len = _CMD_HEADER.unpack_from(payload_dec)
                 data = payload_dec[4:4+data_len]
-                
+
                 # Update Session State
-                self.session_id = struct.unpack(">H", header[:2])[0]
-                self.rx_seq = struct.unpack(">I", header[2:6])[0] 
-                
-                # Log ALL received commands for diagnostics
+                self.session_id, self.rx_seq = session_id, tx_seq
+
                 # Log ALL received commands for diagnostics
-                expected_str = f"0x{expected_cmd:04x}" if expected_cmd is not None else "any"
-                _LOGGER.debug(f"RECV cmd=0x{cmd_id:04x} data_len={data_len} data={data.hex() if data else 'empty'} (expecting {expected_str})")
-                
-                if not expected_cmd or cmd_id == expected_cmd:
-                    return {'command': cmd_id, 'data': data}
-                
-                # Capture section state change events (e.g. physical keypad arm/disarm)
-                if cmd_id == 0x0119 and len(data) >= 2:
-                    section_num = data[0]
-                    section_state = data[1]
-                    self.section_state_events[section_num] = section_state
-                    _LOGGER.debug(f"EVENT CAPTURED: Section state change (0x0119): section={section_num} state={section_state}")
-                elif cmd_id == 0x0102:
-                    self._process_event_0102(data)
-                
-                _LOGGER.debug(f"Skipping unexpected cmd 0x{cmd_id:04x} (waiting for 0x{expected_cmd:04x})")
-                continue
-                
-            except (asyncio.TimeoutError, ConnectionResetError, asyncio.IncompleteReadError) as e:
-                _LOGGER.error(f"Receive Error: {e}")
-                await self._close_socket()
-                return None
-            except Exception as e:
-                _LOGGER.exception(f"Unexpected Receive Error: {e}")
-                await self._close_socket()
-                return None
-        
-        return None
+                _LOGGER.debug("RECV cmd=0x%04x data_len=%d data=%s", cmd_id, data_len, _LazyHex(data))
+                self._dispatch(cmd_id, data)
+
+        except asyncio.CancelledError:
+            raise
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                _LOGGER.error("Receive Error: %s", e)
+            else:
+                _LOGGER.info("Connection closed by panel.")
+        except ConnectionResetError as e:
+            _LOGGER.error("Receive Error: %s", e)
+        except Exception as e:
+            _LOGGER.exception("Unexpected Receive Error: %s", e)
+
+        # Only tear down the connection this task was reading from
+        if self._reader_task is asyncio.current_task():
+            await self._close_socket()
 
-    def _process_event_0102(self, data: bytes):
-        """Parse 0x0102 event log (text-based state changes)."""
+    def _dispatch(self, cmd_id: int, data: bytes):
+        """Hand a packet to the pending request, or treat it as an unsolicited event."""
+        for key in (cmd_id, None):
+            queue = self._pending.get(key)
+            while queue:
+                fut = queue.popleft()
+                if not fut.done():
+                    fut.set_result({'command': cmd_id, 'data': data})
+                    return
+
+        captured = False
+        # Capture section state change events (e.g. physical keypad arm/disarm)
+        if cmd_id == 0x0119 and len(data) >= 2:
+            section_num = data[0]
+            section_state = data[1]
+            self.section_state_events[section_num] = section_state
+            _LOGGER.debug("EVENT CAPTURED: Section state change (0x0119): section=%s state=%s", section_num, section_state)
+            captured = True
+        elif cmd_id == 0x0102:
+            captured = self._process_event_0102(data)
+        else:
+            _LOGGER.debug("Skipping unexpected cmd 0x%04x", cmd_id)
+
+        if captured and self.on_section_event:
+            self.on_section_event()
+
+    def _process_event_0102(self, data: bytes) -> bool:
+        """Parse 0x0102 event log (text-based state changes).
+
+        Returns True if a section state change was captured.
+        """
         try:
             if len(data) < 12:
-                return
+                return False
 
             # Byte 1 seems to be Section ID based on testing (0x02 for section 2)
             section_num = data[1] 
@@ -292,159 +431,124 @@ class UniiClient:
             # Text starts at offset 10 based on sample data
             # 00 02 00 1c 1a 02 12 0b 12 09 [Text...]
             text_data = data[10:]
-            try:
-                # Use latin-1 to avoid decode errors on binary/garbage
-                text = text_data.decode("latin-1", errors="ignore")
-            except:
-                return
 
-            # Check keywords
+            # Check keywords (ASCII) on the raw bytes; the text is only
+            # decoded for the debug log
             new_state = None
-            if "INSCHAKELEN" in text:
+            if b"INSCHAKELEN" in text_data:
                 new_state = 1 # Armed Away
-            elif "UITSCHAKELEN" in text:
+            elif b"UITSCHAKELEN" in text_data:
                 new_state = 2 # Disarmed
             
             if new_state is not None:
                 self.section_state_events[section_num] = new_state
-                _LOGGER.debug(f"EVENT 0x0102 PARSED: section={section_num} state={new_state} text='{text.strip()}'")
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    # Use latin-1 to avoid decode errors on binary/garbage
+                    text = bytes(text_data).decode("latin-1", errors="ignore")
+                    _LOGGER.debug("EVENT 0x0102 PARSED: section=%s state=%s text='%s'", section_num, new_state, text.strip())
+                return True
 
         except Exception as e:
-            _LOGGER.debug(f"Error parsing 0x0102 event: {e}")
+            _LOGGER.debug("Error parsing 0x0102 event: %s", e)
+        return False
 
     async def get_status(self) -> Optional[Dict[str, Any]]:
         """Fetch status of all sections."""
-        async with self._transaction_lock:
-            # Request Section Status (0x0116)
-            mask = b'\xFF' * 4
-            if await self._send_command(0x0116, b'\x01' + mask):
-                return await self._recv_response(expected_cmd=0x0117)
-            return None
+        # Request Section Status (0x0116)
+        mask = b'\xFF' * 4
+        return await self._transact(0x0116, b'\x01' + mask, expected_cmd=0x0117)
 
     async def get_input_status(self) -> Optional[Dict[str, Any]]:
         """Fetch status of all inputs."""
-        async with self._transaction_lock:
-            if await self._send_command(0x0106, b'\x02'):
-                return await self._recv_response(expected_cmd=0x0105)
-            return None
+        return await self._transact(0x0106, b'\x02', expected_cmd=0x0105)
 
-    async def drain_events(self) -> int:
-        """Non-blocking read of any buffered packets from the socket.
-        
-        Captures events (like 0x0119 or 0x0102) that arrived between polls.
-        Returns the number of events captured.
-        """
-        if not self.reader or not self._connected:
-            return 0
-        
-        events_found = 0
-        async with self._transaction_lock:
-            while True:
-                try:
-                    # Non-blocking check: is there data waiting?
-                    # Use a very short timeout to check for buffered data
-                    header_bytes = await asyncio.wait_for(
-                        self.reader.readexactly(14), timeout=0.1
-                    )
-                    header = bytearray(header_bytes)
-                    length = struct.unpack(">H", header[12:14])[0]
-                    
-                    if length < 16 or length > 4096:
-                        _LOGGER.error(f"drain_events: Invalid packet length: {length}")
-                        break
-                    
-                    remaining_bytes = length - 14
-                    body = await asyncio.wait_for(
-                        self.reader.readexactly(remaining_bytes), timeout=1
-                    )
-                    
-                    payload_enc = body[:-2]
-                    payload_dec = self._decrypt(payload_enc, header)
-                    
-                    cmd_id = struct.unpack(">H", payload_dec[:2])[0]
-                    data_len = struct.unpack(">H", payload_dec[2:4])[0]
-                    data = payload_dec[4:4+data_len]
-                    
-                    self.session_id = struct.unpack(">H", header[:2])[0]
-                    self.rx_seq = struct.unpack(">I", header[2:6])[0]
-                    
-                    _LOGGER.debug(f"DRAIN: Received cmd=0x{cmd_id:04x} data={data.hex() if data else 'empty'}")
-                    
-                    # Capture section state change events
-                    if cmd_id == 0x0119 and len(data) >= 2:
-                        section_num = data[0]
-                        section_state = data[1]
-                        self.section_state_events[section_num] = section_state
-                        _LOGGER.debug(f"DRAIN EVENT (0x0119): Section state change: section={section_num} state={section_state}")
-                        events_found += 1
-                    elif cmd_id == 0x0102:
-                        self._process_event_0102(data)
-                        events_found += 1
-                    
-                except asyncio.TimeoutError:
-                    # No more buffered data — normal exit
-                    break
-                except Exception as e:
-                    _LOGGER.warning(f"drain_events error: {e}")
-                    break
-        
-        return events_found
+    async def get_input_arrangement(self, max_blocks: int = 100) -> Dict[str, Dict]:
+        """Fetch input arrangement (blocks of 44 input records).
 
-    async def get_input_arrangement(self) -> Dict[str, Dict]:
-        """Fetch input arrangement (all blocks)."""
+        Blocks are requested ARRANGEMENT_WINDOW at a time, so the round trips
+        overlap; responses are matched to requests in order. Scanning stops
+        early after ARRANGEMENT_EMPTY_BLOCKS consecutive blocks without any
+        valid input (past the panel's last input), so small panels need a handful
+        of round trips instead of max_blocks.
+        """
         inputs = {}
-        async with self._transaction_lock:
-            for block in range(1, 101): # 1 to 100
-                payload = struct.pack(">H", block)
-                if not await self._send_command(0x0140, payload):
-                    _LOGGER.warning(f"Failed to send arrangement request for block {block}")
-                    break
-
-                resp = await self._recv_response(expected_cmd=0x0141, timeout=3)
-                if not resp or len(resp['data']) < 3:
-                     _LOGGER.debug(f"Block {block} empty/invalid response, stopping.")
-                     # If block return empty, usually it means end of inputs? 
-                     # Wait, we decided to purge early exit logic -> BUT if 'data' is basically empty/short, 
-                     # it means the panel literally has no data for this block.
-                     # However, v1.6.7 said "removed early exit".
-                     # If the panel returns a VALID packet with 0 inputs, we continue.
-                     # If it returns NOTHING or INVALID, we stop?
-                     # Let's keep scanning unless error.
-                     if not resp: break
-                     
-                data = resp['data']
-                offset = 3
-                items_in_block = 0
-                
-                while offset + 22 <= len(data):
-                    input_num = ((block - 1) * 44) + items_in_block + 1
-                    
-                    sensor_type = data[offset+1]
-                    reaction = data[offset+2]
-                    name_raw = data[offset+3:offset+19]
-                    name = name_raw.decode("utf-8", errors="replace").strip()
-                    
-                    # Valid Input Check
-                    if name and not all(c == '\x00' for c in name) and "VRIJE TEKST" not in name:
-                         inputs[input_num] = {
-                            "name": name,
-                            "sensor_type": sensor_type,
-                            "reaction": reaction
-                        }
-                    
-                    offset += 22
-                    items_in_block += 1
-                
-                if items_in_block > 0:
-                    _LOGGER.debug(f"Block {block}: {items_in_block} records parsed.")
-
-        _LOGGER.info(f"Input arrangement download complete: {len(inputs)} inputs found.")
+        empty_blocks = 0
+        for window_start in range(1, max_blocks + 1, ARRANGEMENT_WINDOW):
+            window = range(window_start, min(window_start + ARRANGEMENT_WINDOW, max_blocks + 1))
+            # The panel may not answer past its last block: that ends the
+            # scan, it is no reason to drop the session
+            requests = [
+                asyncio.create_task(self._transact(
+                    0x0140, _U16.pack(block), expected_cmd=0x0141, timeout=3, close_on_timeout=False
+                ))
+                for block in window
+            ]
+            try:
+                for block, request in zip(window, requests):
+                    resp = await request
+                    if not resp:
+                        _LOGGER.debug("Block %s: no response, stopping.", block)
+                        return self._arrangement_done(inputs)
+
+                    items_in_block = self._parse_arrangement_block(block, resp['data'], inputs)
+                    if items_in_block > 0:
+                        _LOGGER.debug("Block %s: %s inputs found.", block, items_in_block)
+                        empty_blocks = 0
+                    else:
+                        # Panels may pad unused blocks with all-zero records:
+                        # a block without a single valid input counts as empty
+                        empty_blocks += 1
+                        if empty_blocks >= ARRANGEMENT_EMPTY_BLOCKS:
+                            _LOGGER.debug("Block %s: %d empty blocks in a row, stopping.", block, empty_blocks)
+                            return self._arrangement_done(inputs)
+            finally:
+                # Stopping inside a window: drop the requests still waiting
+                for request in requests:
+                    request.cancel()
+
+        return self._arrangement_done(inputs)
+
+    @staticmethod
+    def _parse_arrangement_block(block: int, data: bytes, inputs: Dict[int, Dict]) -> int:
+        """Add the valid input records of one block to inputs; return how many were kept."""
+        # Whole records only, unpacked in one pass over a zero-copy view
+        records = memoryview(data)[3:]
+        records = records[:len(records) - len(records) % _ARRANGEMENT_RECORD.size]
+        kept = 0
+        first_input = (block - 1) * 44 + 1
+        
+        for slot, (sensor_type, reaction, name_raw) in enumerate(_ARRANGEMENT_RECORD.iter_unpack(records)):
+            # Skip unused (all-zero) and placeholder slots before decoding
+            if not name_raw.strip(b"\x00") or b"VRIJE TEKST" in name_raw:
+                continue
+            name = name_raw.decode("utf-8", errors="replace").strip()
+            
+            # Valid Input Check
+            if name and name.strip("\x00"):
+                 inputs[first_input + slot] = {
+                    "name": name,
+                    "sensor_type": sensor_type,
+                    "reaction": reaction
+                }
+                 kept += 1
+        return kept
+
+    @staticmethod
+    def _arrangement_done(inputs: Dict[int, Dict]) -> Dict[str, Dict]:
+        _LOGGER.info("Input arrangement download complete: %d inputs found.", len(inputs))
         return {"inputs": inputs}
 
     def _bcd_encode(self, data: str) -> bytes:
         """Encode string to 8-byte BCD (Right padded)."""
-        s = str(data).ljust(16, "0")[:16]
-        return bytes.fromhex(s)
+        data = str(data)
+        encoded = self._bcd_cache.get(data)
+        if encoded is None:
+            encoded = bytes.fromhex(data.ljust(16, "0")[:16])
+            if len(self._bcd_cache) >= BCD_CACHE_SIZE:
+                # Bounded against mistyped codes: drop the oldest entry
+                del self._bcd_cache[next(iter(self._bcd_cache))]
+            self._bcd_cache[data] = encoded
+        return encoded
 
     async def bypass_input(self, input_id: int, user_code: str) -> Optional[Dict[str, Any]]:
         return await self._control_input(input_id, user_code, 0x0118, 0x0119)
@@ -453,11 +557,8 @@ class UniiClient:
         return await self._control_input(input_id, user_code, 0x011A, 0x011B)
 
     async def _control_input(self, input_id: int, user_code: str, cmd_req: int, cmd_resp: int) -> Optional[Dict[str, Any]]:
-        async with self._transaction_lock:
-            payload = bytearray([0x00]) + self._bcd_encode(user_code) + struct.pack(">H", input_id)
-            if await self._send_command(cmd_req, payload):
-                return await self._recv_response(expected_cmd=cmd_resp)
-            return None
+        payload = _INPUT_CONTROL.pack(0x00, self._bcd_encode(user_code), input_id)
+        return await self._transact(cmd_req, payload, expected_cmd=cmd_resp)
 
     async def arm_section(self, section_id: int, user_code: str) -> bool:
         """Arm a section."""
@@ -469,11 +570,8 @@ class UniiClient:
 
     async def _control_section(self, section_id: int, user_code: str, cmd_req: int, cmd_resp: int) -> bool:
         """Generic section control."""
-        async with self._transaction_lock:
-            # Payload: 0x00 + BCD Code + 1-Byte Section ID + 0x01
-            # Format matches official py-unii library (UNiiArmDisarmSection.to_bytes)
-            payload = bytearray([0x00]) + self._bcd_encode(user_code) + section_id.to_bytes(1, 'big') + b'\x01'
-            if await self._send_command(cmd_req, payload):
-                resp = await self._recv_response(expected_cmd=cmd_resp)
-                return resp is not None
-            return False
+        # Payload: 0x00 + BCD Code + 1-Byte Section ID + 0x01
+        # Format matches official py-unii library (UNiiArmDisarmSection.to_bytes)
+        payload = _SECTION_CONTROL.pack(0x00, self._bcd_encode(user_code), section_id, 0x01)
+        resp = await self._transact(cmd_req, payload, expected_cmd=cmd_resp)
+        return resp is not None
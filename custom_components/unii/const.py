@@ -1,6 +1,21 @@
 """Constants for the Unii integration."""
+from datetime import timedelta
 
 DOMAIN = "unii"
 CONF_SHARED_KEY = "shared_key"
 CONF_USER_CODE = "user_code"
 DEFAULT_PORT = 6502
+
+# Section polling backs off while nothing changes (section events are pushed)
+# and speeds up while an exit/entry timer is running
+SECTION_SCAN_INTERVAL = timedelta(seconds=5)
+SECTION_SCAN_INTERVAL_MAX = timedelta(seconds=30)
+SECTION_SCAN_INTERVAL_FAST = timedelta(seconds=1)
+INPUT_SCAN_INTERVAL = timedelta(seconds=5)
+
+# Refresh requests (e.g. after commands) within this window are coalesced, in seconds
+REQUEST_REFRESH_COOLDOWN = 0.3
+
+# Reconnect backoff of the keepalive task, in seconds
+RECONNECT_DELAY_MIN = 5
+RECONNECT_DELAY_MAX = 60
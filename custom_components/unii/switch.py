@@ -20,143 +20,134 @@ import asyncio
 from typing import Any
 
 from homeassistant.components.switch import SwitchEntity
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import CONF_USER_CODE
+from .client import _is_valid_code
 
 _LOGGER = logging.getLogger(__name__)
 
+# Result byte of a (un)bypass response (1 = success) -> failure reason
+_BYPASS_RESULT_ERRORS = {
+    2: "Authentication Failed (Check User Code)",
+    3: "Not Allowed",
+}
+
+
+def _bypass_succeeded(op: str, input_id, resp) -> bool:
+    """Log the outcome of a (un)bypass command and return whether it succeeded."""
+    # Response data: input id (2 bytes) | result
+    data = resp["data"] if resp else b""
+    if len(data) < 3:
+        _LOGGER.error("%s Input %s Failed: No response or invalid data", op, input_id)
+        return False
+    result = data[2]
+    if result == 1:
+        _LOGGER.debug("%s Input %s Success", op, input_id)
+        return True
+    reason = _BYPASS_RESULT_ERRORS.get(result)
+    if reason:
+        _LOGGER.error("%s Input %s Failed: %s", op, input_id, reason)
+    else:
+        _LOGGER.error("%s Input %s Failed: Result Code %s", op, input_id, result)
+    return False
+
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up the Unii switch platform."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry.runtime_data.inputs
     
     await coordinator.async_config_entry_first_refresh()
+
+    # Resolve the user code once; a changed code reloads the entry.
+    # Check data first (primary storage per config_flow.py)
+    user_code = entry.data.get(CONF_USER_CODE) or entry.options.get(CONF_USER_CODE)
+    if not user_code:
+        _LOGGER.warning("No user code configured. Falling back to default '1234'.")
+        user_code = "1234"
+    else:
+        user_code = str(user_code).strip()
+    if not _is_valid_code(user_code):
+        # The panel takes up to 16 BCD digits; refuse to send anything else
+        _LOGGER.error("Configured user code is not 1-16 digits; bypass switches will not work")
+        user_code = None
     
-    entities = []
-    if coordinator.data and "inputs" in coordinator.data:
-        for input_id, record in coordinator.data["inputs"].items():
-            # Allow bypassing ALL sensor types (including Type 0)
-            # stype = record.get("sensor_type")
-            # if stype in [1, 15]: 
-            entities.append(UniiBypassSwitch(coordinator, input_id))
-            
+    # Allow bypassing ALL sensor types (including Type 0)
+    # stype = record.sensor_type
+    # if stype in [1, 15]:
+    entities = [
+        UniiBypassSwitch(coordinator, input_id, user_code)
+        for input_id in coordinator.data["inputs"]
+    ]
     async_add_entities(entities)
 
 class UniiBypassSwitch(CoordinatorEntity, SwitchEntity):
     """Switch to bypass/unbypass a Unii input."""
 
-    def __init__(self, coordinator, input_id):
+    _attr_icon = "mdi:shield-off"
+
+    def __init__(self, coordinator, input_id, user_code):
         super().__init__(coordinator)
         self._input_id = input_id
-        record = coordinator.data.get("inputs", {}).get(input_id, {})
-        name = record.get("name", f"Input {input_id}")
-        self._attr_name = f"{name} Bypass"
+        self._user_code = user_code
+        # Entities are only created for inputs present in the first poll
+        self._attr_name = f"{coordinator.data['inputs'][input_id].name} Bypass"
         self._attr_unique_id = f"{coordinator.config_entry.entry_id}_input_{input_id}_bypass"
-        self._attr_icon = "mdi:shield-off"
+        self._update_attrs()
 
-    @property
-    def is_on(self) -> bool:
-        """Return true if the input is bypassed."""
-        if not self.coordinator.data or "inputs" not in self.coordinator.data:
-            return False
+    def _update_attrs(self) -> None:
+        """Derive is_on (input bypassed) from the current coordinator data."""
+        # The input poll always returns {"inputs": ...}; an input may drop out
         status_record = self.coordinator.data["inputs"].get(self._input_id)
-        if not status_record:
-            return False
-        return status_record.get("bypassed", False)
+        self._attr_is_on = bool(status_record and status_record.bypassed)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._update_attrs()
+        super()._handle_coordinator_update()
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Bypass the input."""
-        # Check data first (primary storage per config_flow.py)
-        code = self.coordinator.config_entry.data.get("user_code")
-        if not code:
-            code = self.coordinator.config_entry.options.get("user_code")
-            
-        if not code:
-            _LOGGER.warning("No user code configured. Falling back to default '1234'.")
-            code = "1234"
-
-        client = self.coordinator.client
-        
-        # Use shared lock to prevent collision with poll
-        async with self.coordinator.operation_lock:
-            try:
-                if not await client.connect():
-                    _LOGGER.error("Could not connect to panel for bypass command")
-                    return
-                
-                resp = await client.bypass_input(self._input_id, code)
-                if resp and len(resp) >= 3:
-                    result = resp[2]
-                    if result == 1:
-                        _LOGGER.info(f"Bypass Input {self._input_id} Success")
-                    elif result == 2:
-                        _LOGGER.error(f"Bypass Input {self._input_id} Failed: Authentication Failed (Check User Code)")
-                        return
-                    elif result == 3:
-                        _LOGGER.error(f"Bypass Input {self._input_id} Failed: Not Allowed")
-                        return
-                    else:
-                        _LOGGER.error(f"Bypass Input {self._input_id} Failed: Result Code {result}")
-                        return
-                else:
-                    _LOGGER.error(f"Bypass Input {self._input_id} Failed: No response or invalid data")
-                    return
-            except Exception as e:
-                _LOGGER.error(f"Failed to bypass input {self._input_id}: {e}")
-
-        # Optimistic Update
-        # We assume success means it IS bypassed.
-        if self.coordinator.data and "inputs" in self.coordinator.data:
-             if self._input_id in self.coordinator.data["inputs"]:
-                 self.coordinator.data["inputs"][self._input_id]["bypassed"] = True
-                 self.async_write_ha_state()
-
-        # Schedule a refresh to confirm (no delay needed if optimistic)
-        self.coordinator.async_request_refresh()
+        await self._set_bypass(True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Unbypass the input."""
-        # Check data first (primary storage per config_flow.py)
-        code = self.coordinator.config_entry.data.get("user_code")
-        if not code:
-            code = self.coordinator.config_entry.options.get("user_code")
-            
-        if not code:
-            _LOGGER.warning("No user code configured. Falling back to default '1234'.")
-            code = "1234"
+        await self._set_bypass(False)
 
+    async def _set_bypass(self, bypass: bool) -> None:
+        """Send a (un)bypass command, show the optimistic state and confirm it."""
+        op = "Bypass" if bypass else "Unbypass"
         client = self.coordinator.client
+        command = client.bypass_input if bypass else client.unbypass_input
+        if not self._user_code:
+            _LOGGER.error("Cannot %s input %s: no valid user code configured", op.lower(), self._input_id)
+            return
         
-        async with self.coordinator.operation_lock:
-            try:
-                if not await client.connect():
-                    _LOGGER.error("Could not connect to panel for unbypass command")
-                    return
-                
-                resp = await client.unbypass_input(self._input_id, code)
-                if resp and len(resp) >= 3:
-                    result = resp[2]
-                    if result == 1:
-                        _LOGGER.info(f"Unbypass Input {self._input_id} Success")
-                    elif result == 2:
-                        _LOGGER.error(f"Unbypass Input {self._input_id} Failed: Authentication Failed (Check User Code)")
-                        return
-                    elif result == 3:
-                        _LOGGER.error(f"Unbypass Input {self._input_id} Failed: Not Allowed")
-                        return
-                    else:
-                        _LOGGER.error(f"Unbypass Input {self._input_id} Failed: Result Code {result}")
-                        return
-                else:
-                    _LOGGER.error(f"Unbypass Input {self._input_id} Failed: No response or invalid data")
-                    return
-            except Exception as e:
-                _LOGGER.error(f"Failed to unbypass input {self._input_id}: {e}")
+        try:
+            if not await client.connect():
+                _LOGGER.error("Could not connect to panel for %s command", op.lower())
+                return
+            
+            resp = await command(self._input_id, self._user_code)
+            if not _bypass_succeeded(op, self._input_id, resp):
+                return
+        except Exception as e:
+            _LOGGER.error("Failed to %s input %s: %s", op.lower(), self._input_id, e)
+            return
 
         # Optimistic Update
-        if self.coordinator.data and "inputs" in self.coordinator.data:
-             if self._input_id in self.coordinator.data["inputs"]:
-                 self.coordinator.data["inputs"][self._input_id]["bypassed"] = False
-                 self.async_write_ha_state()
+        # We assume success means the new state took; the next poll confirms it.
+        self._attr_is_on = bypass
+        self.async_write_ha_state()
 
-        self.coordinator.async_request_refresh()
+        # Confirm with a poll; the coordinator's debouncer coalesces the
+        # requests of back-to-back toggles into one trailing poll
+        answered_polls = self.coordinator.answered_polls
+        await self.coordinator.async_request_refresh()
+        # An unchanged input frame notifies no listener: re-derive the state
+        # so a command the panel ignored does not leave the optimistic one.
+        # Only when a poll was answered: a deferred or failed one would
+        # flip the switch back to the data from before the command.
+        if self.coordinator.answered_polls != answered_polls:
+            self._update_attrs()
+            self.async_write_ha_state()